@@ -1,6 +1,6 @@
 import os
-import json
 import re
+import orjson
 from emergentintegrations.llm.chat import LlmChat, UserMessage
 from pre_extraction import run_pre_extraction, find_explicit_totals
 
@@ -1405,7 +1405,7 @@ async def analyze_contract_text(
     # ═══════════════════════════════════════════════════════════════════════════
     
     # Determine what documents to scan based on what's available
-    pre_extraction_contract = contract_text if contract_text else (text if "CONTRACT" in text.upper()[:5000] else None)
+    pre_extraction_contract = contract_text if contract_text else (text if "CONTRACT" in text[:5000].upper() else None)
     pre_extraction_proposal = proposal_text if proposal_text else None
     
     # If text contains both contract and proposal sections, try to split
@@ -1433,10 +1433,13 @@ async def analyze_contract_text(
     # Format explicit totals for prompt
     totals_section = ""
     if explicit_totals:
-        totals_section = "\n═══ EXPLICIT TOTALS FOUND ═══\n"
-        for t in explicit_totals[:5]:
-            totals_section += f"  Line {t['line_number']}: {t['amount']} - {t['line_text'][:80]}\n"
-        totals_section += "═" * 50 + "\n"
+        totals_lines = ["", "═══ EXPLICIT TOTALS FOUND ═══"]
+        totals_lines.extend(
+            f"  Line {t['line_number']}: {t['amount']} - {t['line_text'][:80]}"
+            for t in explicit_totals[:5]
+        )
+        totals_lines.append("═" * 50)
+        totals_section = "\n".join(totals_lines) + "\n"
     
     # ═══════════════════════════════════════════════════════════════════════════
     # BUILD PROMPT WITH PRE-EXTRACTION OUTPUT FIRST
@@ -1505,11 +1508,11 @@ async def analyze_contract_text(
             match = re.search(r'\{.*\}', response_text, re.DOTALL)
             if match:
                 json_str = match.group(0)
-                return json.loads(json_str)
+                return orjson.loads(json_str)
             else:
                 # Try simple cleaning if regex failed (unlikely for valid JSON)
                 cleaned_json = response_text.replace("```json", "").replace("```", "").strip()
-                return json.loads(cleaned_json)
+                return orjson.loads(cleaned_json)
                 
         except Exception as e:
             print(f"JSON Parse Error. Raw Text:\n{response_text}")
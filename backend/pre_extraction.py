@@ -8,7 +8,7 @@ insurance, OCIP/CCIP, addresses, deposits/retainers, escalation/tariffs, scope t
 """
 
 import re
-from typing import List, Dict, Tuple, Optional
+from typing import List, Dict, Optional
 from dataclasses import dataclass
 from collections import defaultdict
 
@@ -268,6 +268,8 @@ KEYWORD_GROUPS = {
 @dataclass
 class ExtractedMatch:
     """Represents a single extracted keyword match with context."""
+    __slots__ = ("category", "line_number", "exact_line", "context", "matched_keyword")
+    
     category: str
     line_number: int
     exact_line: str
@@ -286,7 +288,7 @@ class ExtractedMatch:
     
     def _normalize(self, text: str) -> str:
         """Normalize text for comparison."""
-        return re.sub(r'\s+', ' ', text.lower().strip())[:100]
+        return WHITESPACE_PATTERN.sub(' ', text.lower().strip())[:100]
 
 
 def compile_patterns() -> Dict[str, List[re.Pattern]]:
@@ -300,6 +302,11 @@ def compile_patterns() -> Dict[str, List[re.Pattern]]:
 
 # Pre-compile patterns
 COMPILED_PATTERNS = compile_patterns()
+WHITESPACE_PATTERN = re.compile(r'\s+')
+
+# Explicit totals: actual dollar amounts (not blanks) and total indicators
+AMOUNT_PATTERN = re.compile(r'\$\s*([\d,]+\.?\d*)', re.IGNORECASE)
+TOTAL_INDICATOR_PATTERN = re.compile(r'\b(total|contract\s*sum|subcontract\s*price|agreement\s*amount|grand\s*total)\b', re.IGNORECASE)
 
 
 def get_context_lines(lines: List[str], line_idx: int, context_range: int = 2) -> List[str]:
@@ -330,8 +337,14 @@ def extract_keywords_from_text(text: str, document_type: str = "contract") -> Li
     matches = []
     seen_matches = set()  # For deduplication
     
+    # Scan each distinct line once, at its first occurrence. A repeated line
+    # (blank lines, page headers/footers) would only yield a duplicate match_key.
+    first_line_idx = {}
+    for line_idx, line in enumerate(lines):
+        first_line_idx.setdefault(line, line_idx)
+    
     for category, patterns in COMPILED_PATTERNS.items():
-        for line_idx, line in enumerate(lines):
+        for line, line_idx in first_line_idx.items():
             for pattern in patterns:
                 if pattern.search(line):
                     # Get context
@@ -455,17 +468,13 @@ def find_explicit_totals(text: str) -> List[Dict]:
     totals = []
     lines = text.split('\n')
     
-    # Pattern for actual dollar amounts (not blanks)
-    amount_pattern = re.compile(r'\$\s*([\d,]+\.?\d*)', re.IGNORECASE)
-    total_indicator = re.compile(r'\b(total|contract\s*sum|subcontract\s*price|agreement\s*amount|grand\s*total)\b', re.IGNORECASE)
-    
     for line_idx, line in enumerate(lines):
         # Skip blank amount fields
         if '________' in line or '$ _' in line:
             continue
             
-        if total_indicator.search(line):
-            amounts = amount_pattern.findall(line)
+        if TOTAL_INDICATOR_PATTERN.search(line):
+            amounts = AMOUNT_PATTERN.findall(line)
             for amount in amounts:
                 # Filter out small amounts (likely not contract totals)
                 try:
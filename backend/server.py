@@ -1,14 +1,15 @@
 import os
-import json
+import asyncio
 from datetime import datetime, timedelta
 from bson import ObjectId
-from fastapi import FastAPI, UploadFile, File, HTTPException, Body, Query
+from fastapi import FastAPI, UploadFile, File, HTTPException, Body
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse, StreamingResponse
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import JSONResponse, ORJSONResponse, StreamingResponse
 from motor.motor_asyncio import AsyncIOMotorClient
-import gridfs
+from pymongo import InsertOne, UpdateMany, UpdateOne
 from pydantic import BaseModel
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict
 from dotenv import load_dotenv
 import io
 
@@ -24,7 +25,21 @@ DB_NAME = os.environ.get("DB_NAME", "abs_contract_admin")
 PORT = 8001
 RETENTION_DAYS = 90  # Contract reviews retained for 90 days
 
-app = FastAPI(title="ABS Contract Admin Agent")
+# Analysis tasks that primarily use the Active Contract as LLM context
+CONTRACT_CONTEXT_TASKS = frozenset({
+    "CONTRACT_REVIEW", "INITIAL_CONTRACT_REVIEW", "SCHEDULE_ANALYSIS", "PM_CONTRACT_REVIEW_SUMMARY",
+    "PROCORE_MAPPING", "ACCOUNT_MANAGER_SUMMARY_EMAIL", "NEGOTIATION_SUGGESTED_REPLY",
+    "POST_EXECUTION_SUMMARY",
+})
+
+# Text extractors keyed by lowercased file extension
+TEXT_EXTRACTORS = {
+    ".pdf": extract_text_from_pdf,
+    ".docx": extract_text_from_docx,
+}
+
+# orjson renders response bodies in C (notably the large extracted_text payloads)
+app = FastAPI(title="ABS Contract Admin Agent", default_response_class=ORJSONResponse)
 
 # --- CORS ---
 app.add_middleware(
@@ -35,8 +50,15 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# --- Compression ---
+# Document and review payloads carry full extracted_text; gzip them for clients
+# that send Accept-Encoding (browsers and requests do by default)
+app.add_middleware(GZipMiddleware, minimum_size=1000, compresslevel=6)
+
 # --- Database ---
-client = AsyncIOMotorClient(MONGO_URL)
+# Keep a couple of pooled connections warm so the first requests after idle
+# skip the connect/handshake; cap the pool for this single API process.
+client = AsyncIOMotorClient(MONGO_URL, maxPoolSize=20, minPoolSize=2)
 db = client[DB_NAME]
 
 # For simpler async GridFS:
@@ -63,6 +85,10 @@ async def ensure_ttl_indexes():
 async def startup_db_client():
     await ensure_ttl_indexes()
 
+@app.on_event("shutdown")
+async def shutdown_db_client():
+    client.close()
+
 # --- Models ---
 class SessionCreate(BaseModel):
     task_type: str = "CONTRACT_REVIEW"
@@ -124,26 +150,19 @@ async def upload_file(file: UploadFile = File(...), document_type: str = "contra
         text = ""
         file_stream = io.BytesIO(content)
         
-        if filename.lower().endswith(".pdf"):
-            text = extract_text_from_pdf(file_stream)
-        elif filename.lower().endswith(".docx"):
-            text = extract_text_from_docx(file_stream)
+        extractor = TEXT_EXTRACTORS.get(os.path.splitext(filename)[1].lower())
+        if extractor:
+            # CPU-bound parsing runs in a worker thread so other requests aren't stalled
+            text = await asyncio.to_thread(extractor, file_stream)
         else:
             text = "Unsupported file type for text extraction."
 
-        # 4. Mark ALL previous active documents of same type as "previous"
-        # IMPORTANT: Always deactivate ALL active documents of this type globally first
-        # Then only the newly uploaded document will be active
-        await db.documents.update_many(
-            {"document_type": document_type, "is_active": True}, 
-            {"$set": {"is_active": False}}
-        )
-
-        # 5. Save Metadata to 'documents' collection with document type and active status
+        # 4. Build Metadata for 'documents' collection with document type and active status
+        upload_date = datetime.utcnow()
         file_doc = {
             "_id": file_id,
             "filename": filename,
-            "upload_date": datetime.utcnow(),
+            "upload_date": upload_date,
             "size": file_size,
             "content_type": content_type,
             "extracted_text": text,
@@ -152,14 +171,22 @@ async def upload_file(file: UploadFile = File(...), document_type: str = "contra
             "is_active": True,  # Most recent upload of this type becomes active
             "session_id": session_id  # Link to session
         }
-        await db.documents.insert_one(file_doc)
+
+        # 5. Mark ALL previous active documents of same type as "previous", then save
+        # IMPORTANT: Always deactivate ALL active documents of this type globally first
+        # Then only the newly uploaded document will be active
+        # Ordered bulk write keeps that sequence in a single round trip
+        await db.documents.bulk_write([
+            UpdateMany({"document_type": document_type, "is_active": True}, {"$set": {"is_active": False}}),
+            InsertOne(file_doc)
+        ], ordered=True)
 
         return JSONResponse(status_code=200, content={
             "file_id": str(file_id),
             "filename": filename,
             "document_type": document_type,
             "is_active": True,
-            "upload_date": datetime.utcnow().isoformat(),
+            "upload_date": upload_date.isoformat(),
             "text_preview": text[:200] + "..."
         })
 
@@ -222,25 +249,22 @@ async def set_active_document(request: SetActiveRequest):
     if not doc:
         raise HTTPException(status_code=404, detail="Document not found")
     
-    # Deactivate all documents of this type
-    await db.documents.update_many(
-        {"document_type": request.document_type},
-        {"$set": {"is_active": False}}
-    )
-    
-    # Set the specified document as active
-    await db.documents.update_one(
-        {"_id": ObjectId(request.file_id)},
-        {"$set": {"is_active": True, "document_type": request.document_type}}
-    )
+    # Deactivate all documents of this type, then set the specified document as active
+    # (ordered bulk write: one round trip, same sequence)
+    await db.documents.bulk_write([
+        UpdateMany({"document_type": request.document_type}, {"$set": {"is_active": False}}),
+        UpdateOne({"_id": ObjectId(request.file_id)}, {"$set": {"is_active": True, "document_type": request.document_type}})
+    ], ordered=True)
     
     return {"status": "success", "file_id": request.file_id, "document_type": request.document_type, "is_active": True}
 
 @app.get("/api/documents/active")
 async def get_active_documents():
     """Get the currently active contract and proposal documents."""
-    active_contract = await db.documents.find_one({"document_type": "contract", "is_active": True})
-    active_proposal = await db.documents.find_one({"document_type": "proposal", "is_active": True})
+    active_contract, active_proposal = await asyncio.gather(
+        db.documents.find_one({"document_type": "contract", "is_active": True}),
+        db.documents.find_one({"document_type": "proposal", "is_active": True})
+    )
     
     result = {
         "contract": None,
@@ -310,24 +334,23 @@ async def run_analysis(request: AnalysisRequest):
     - Scope Review: Uses Active Proposal (baseline) + Active Contract (for comparison)
     - Proposal Comparison: Uses Active Proposal + Active Contract (if both exist)
     """
-    # 1. Get the specified file (for backwards compatibility)
-    doc = await db.documents.find_one({"_id": ObjectId(request.file_id)})
+    # 1. Get the specified file (for backwards compatibility) and
+    # 2. the active documents for context-aware analysis, in parallel
+    doc, active_contract, active_proposal = await asyncio.gather(
+        db.documents.find_one({"_id": ObjectId(request.file_id)}),
+        db.documents.find_one({"document_type": "contract", "is_active": True}),
+        db.documents.find_one({"document_type": "proposal", "is_active": True})
+    )
     if not doc:
         raise HTTPException(status_code=404, detail="File not found")
     
-    # 2. Get active documents for context-aware analysis
-    active_contract = await db.documents.find_one({"document_type": "contract", "is_active": True})
-    active_proposal = await db.documents.find_one({"document_type": "proposal", "is_active": True})
-    
     # 3. Determine which text to use based on task type
     text = ""
     proposal_text = ""
     contract_text = ""
     
     # Build context based on task type
-    if request.task_type in ["CONTRACT_REVIEW", "INITIAL_CONTRACT_REVIEW", "SCHEDULE_ANALYSIS", "PM_CONTRACT_REVIEW_SUMMARY", 
-                              "PROCORE_MAPPING", "ACCOUNT_MANAGER_SUMMARY_EMAIL", "NEGOTIATION_SUGGESTED_REPLY",
-                              "POST_EXECUTION_SUMMARY"]:
+    if request.task_type in CONTRACT_CONTEXT_TASKS:
         # These tasks primarily use Contract
         if active_contract:
             contract_text = active_contract.get("extracted_text", "")
@@ -432,18 +455,27 @@ async def run_analysis(request: AnalysisRequest):
         schedule_analysis_data = structured_data.get("schedule_analysis_data")
         if schedule_analysis_data:
             project_name = schedule_analysis_data.get("project_name", "Project")
-            # Create a nice text representation for the PDF
-            schedule_text = f"Project: {project_name}\n\n"
-            schedule_text += f"Contract Start: {schedule_analysis_data.get('contract_start_date')}\n"
-            schedule_text += f"Contract Completion: {schedule_analysis_data.get('contract_completion_date')}\n\n"
+            # Create a nice text representation for the PDF (lines joined once at the end)
+            schedule_lines = [
+                f"Project: {project_name}",
+                "",
+                f"Contract Start: {schedule_analysis_data.get('contract_start_date')}",
+                f"Contract Completion: {schedule_analysis_data.get('contract_completion_date')}",
+                "",
+            ]
             
             if schedule_analysis_data.get("abs_scopes"):
-                schedule_text += "--- ABS Scopes ---\n"
+                schedule_lines.append("--- ABS Scopes ---")
                 for scope in schedule_analysis_data.get("abs_scopes"):
-                    schedule_text += f"\nScope: {scope.get('scope_name')}\n"
-                    schedule_text += f"  Start: {scope.get('start_date')}\n"
-                    schedule_text += f"  Finish: {scope.get('completion_date')}\n"
-                    schedule_text += f"  Basis: {scope.get('basis')}\n"
+                    schedule_lines.extend([
+                        "",
+                        f"Scope: {scope.get('scope_name')}",
+                        f"  Start: {scope.get('start_date')}",
+                        f"  Finish: {scope.get('completion_date')}",
+                        f"  Basis: {scope.get('basis')}",
+                    ])
+            
+            schedule_text = "\n".join(schedule_lines) + "\n"
 
         if schedule_text and "Schedule not found" not in schedule_text:
             if project_name == "Unknown Project":
@@ -614,20 +646,22 @@ async def save_contract_review(request: SaveContractReviewRequest):
                 else:
                     proposals.append(doc_info)
         
+        now = datetime.utcnow()
+
         # Determine project name
         project_name = request.project_name
         if not project_name and request.summary_data:
             project_name = request.summary_data.get("project_name", "Untitled Review")
         if not project_name:
-            project_name = f"Contract Review - {datetime.utcnow().strftime('%Y-%m-%d %H:%M')}"
+            project_name = f"Contract Review - {now.strftime('%Y-%m-%d %H:%M')}"
         
         # Create contract review document
         review_doc = {
             "session_id": request.session_id,
             "project_name": project_name,
-            "created_at": datetime.utcnow(),
-            "updated_at": datetime.utcnow(),
-            "expires_at": datetime.utcnow() + timedelta(days=RETENTION_DAYS),
+            "created_at": now,
+            "updated_at": now,
+            "expires_at": now + timedelta(days=RETENTION_DAYS),
             "contracts": contracts,
             "proposals": proposals,
             "messages": request.messages or (session.get("messages", []) if session else []),
@@ -645,7 +679,7 @@ async def save_contract_review(request: SaveContractReviewRequest):
             await db.contract_reviews.update_one(
                 {"_id": existing["_id"]},
                 {"$set": {
-                    "updated_at": datetime.utcnow(),
+                    "updated_at": now,
                     "project_name": project_name,
                     "contracts": contracts,
                     "proposals": proposals,
@@ -675,12 +709,13 @@ async def list_contract_reviews(limit: int = 50, skip: int = 0):
     try:
         cursor = db.contract_reviews.find().sort("updated_at", -1).skip(skip).limit(limit)
         reviews = []
+        now = datetime.utcnow()
         async for doc in cursor:
             # Calculate days remaining
             expires_at = doc.get("expires_at")
             days_remaining = None
             if expires_at:
-                delta = expires_at - datetime.utcnow()
+                delta = expires_at - now
                 days_remaining = max(0, delta.days)
             
             reviews.append({
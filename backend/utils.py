@@ -1,17 +1,23 @@
-import io
 import fitz  # PyMuPDF
 from docx import Document
 from bson import ObjectId
+from datetime import date, datetime
 from fpdf import FPDF
 
+def iter_pdf_pages(file_stream):
+    """Yields the text of each page of a PDF file stream, one page at a time."""
+    pdf_bytes = file_stream.getvalue()
+    with fitz.open(stream=pdf_bytes, filetype="pdf") as doc:
+        for page in doc:
+            # One get_text() per page builds one TextPage. If another view (e.g. blocks)
+            # is ever needed, build it once with page.get_textpage() and pass textpage=
+            yield page.get_text()
+
 def extract_text_from_pdf(file_stream):
     """Extracts text from a PDF file stream."""
-    text = ""
     try:
-        pdf_bytes = file_stream.getvalue()
-        with fitz.open(stream=pdf_bytes, filetype="pdf") as doc:
-            for page in doc:
-                text += page.get_text()
+        # Collect pages and join once; += re-copies the text per page
+        text = "".join(iter_pdf_pages(file_stream))
     except Exception as e:
         print(f"PDF Extraction Error: {e}")
         text = f"[Error extracting PDF: {str(e)}]"
@@ -22,12 +28,10 @@ def extract_text_from_docx(file_stream):
     text = []
     try:
         doc = Document(file_stream)
-        for para in doc.paragraphs:
-            text.append(para.text)
+        text.extend(para.text for para in doc.paragraphs)
         for table in doc.tables:
              for row in table.rows:
-                 row_text = " | ".join([cell.text for cell in row.cells])
-                 text.append(row_text)
+                 text.append(" | ".join(cell.text for cell in row.cells))
     except Exception as e:
         print(f"DOCX Extraction Error: {e}")
         return f"[Error extracting DOCX: {str(e)}]"
@@ -48,8 +52,8 @@ def create_pdf_from_text(text: str, title: str = "Extracted Content") -> bytes:
         pdf.set_font("Arial", size=12)
         
         # Clean text for FPDF compatibility (latin-1)
-        # Remove unsupported characters
-        safe_text = text.encode('latin-1', 'replace').decode('latin-1')
+        # Remove unsupported characters (ASCII text is already safe; isascii() is O(1))
+        safe_text = text if text.isascii() else text.encode('latin-1', 'replace').decode('latin-1')
         
         pdf.multi_cell(0, 10, safe_text)
         
@@ -59,22 +63,30 @@ def create_pdf_from_text(text: str, title: str = "Extracted Content") -> bytes:
         print(f"PDF Generation Error: {e}")
         return b""
 
+def _serialize_value(value):
+    serializer = _SERIALIZERS.get(type(value))
+    return serializer(value) if serializer else value
+
+def _serialize_dict(doc):
+    # Lookup inlined: most values are plain scalars and need no function call
+    new_doc = {}
+    for k, v in doc.items():
+        serializer = _SERIALIZERS.get(type(v))
+        new_doc[k] = serializer(v) if serializer else v
+    return new_doc
+
+def _serialize_list(doc):
+    return [_serialize_value(item) for item in doc]
+
+# Exact-type dispatch: plain str/int/etc. values miss with a single dict lookup
+_SERIALIZERS = {
+    dict: _serialize_dict,
+    list: _serialize_list,
+    ObjectId: str,
+    datetime: datetime.isoformat,
+    date: date.isoformat,
+}
+
 def serialize_doc(doc):
     """Recursively converts ObjectId and datetime to strings for JSON serialization."""
-    if isinstance(doc, list):
-        return [serialize_doc(item) for item in doc]
-    if isinstance(doc, dict):
-        new_doc = {}
-        for k, v in doc.items():
-            if isinstance(v, ObjectId):
-                new_doc[k] = str(v)
-            elif hasattr(v, 'isoformat'): # datetime
-                new_doc[k] = v.isoformat()
-            elif isinstance(v, dict):
-                new_doc[k] = serialize_doc(v)
-            elif isinstance(v, list):
-                new_doc[k] = serialize_doc(v)
-            else:
-                new_doc[k] = v
-        return new_doc
-    return doc
+    return _serialize_value(doc)
@@ -1,18 +1,60 @@
-import requests
+import asyncio
+import httpx
 import sys
 import json
 import os
 from datetime import datetime
 
+# Request timeouts in seconds: quick API calls vs. file uploads
+TIMEOUT_SHORT = httpx.Timeout(10.0, connect=5.0)
+TIMEOUT_LONG = httpx.Timeout(30.0, connect=5.0)
+
+# Transient gateway errors worth retrying on idempotent calls
+RETRY_STATUSES = {502, 503, 504}
+RETRY_METHODS = {"GET", "DELETE"}
+
+class RetryTransport(httpx.AsyncHTTPTransport):
+    """Async transport that retries idempotent requests on transient gateway errors."""
+
+    def __init__(self, total=3, backoff_factor=0.3, **kwargs):
+        super().__init__(retries=total, **kwargs)  # connection-level retries
+        self.total = total
+        self.backoff_factor = backoff_factor
+
+    async def handle_async_request(self, request):
+        for attempt in range(self.total + 1):
+            response = await super().handle_async_request(request)
+            if (response.status_code not in RETRY_STATUSES
+                    or request.method not in RETRY_METHODS
+                    or attempt == self.total):
+                return response
+            await response.aclose()
+            await asyncio.sleep(self.backoff_factor * (2 ** attempt))
+
 class DocumentIngestionTester:
     def __init__(self, base_url="https://github-contract-add.preview.emergentagent.com"):
         self.base_url = base_url
+        self.client = None
         self.tests_run = 0
         self.tests_passed = 0
         self.contract_file_ids = []
         self.proposal_file_ids = []
         self.test_results = []
 
+    async def __aenter__(self):
+        # One keep-alive client for the whole run; limits live on the transport
+        # because httpx ignores client-level limits when a transport is given
+        self.client = httpx.AsyncClient(
+            transport=RetryTransport(
+                limits=httpx.Limits(max_connections=20, max_keepalive_connections=10),
+            ),
+            timeout=TIMEOUT_LONG,
+        )
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.client.aclose()
+
     def log_result(self, test_name, passed, details=""):
         """Log test result"""
         self.tests_run += 1
@@ -34,11 +76,11 @@ class DocumentIngestionTester:
         })
         return passed
 
-    def test_health_check(self):
+    async def test_health_check(self):
         """Test health endpoint"""
         print("\n🔍 Testing Health Check...")
         try:
-            response = requests.get(f"{self.base_url}/api/health", timeout=10)
+            response = await self.client.get(f"{self.base_url}/api/health", timeout=TIMEOUT_SHORT)
             passed = response.status_code == 200 and response.json().get("status") == "healthy"
             return self.log_result(
                 "Health Check",
@@ -48,11 +90,11 @@ class DocumentIngestionTester:
         except Exception as e:
             return self.log_result("Health Check", False, str(e))
 
-    def test_list_documents_empty(self):
+    async def test_list_documents_empty(self):
         """Test listing documents when empty"""
         print("\n🔍 Testing List Documents (Initial)...")
         try:
-            response = requests.get(f"{self.base_url}/api/documents", timeout=10)
+            response = await self.client.get(f"{self.base_url}/api/documents", timeout=TIMEOUT_SHORT)
             if response.status_code == 200:
                 data = response.json()
                 passed = isinstance(data, list)
@@ -70,7 +112,7 @@ class DocumentIngestionTester:
         except Exception as e:
             return self.log_result("List Documents (Initial)", False, str(e))
 
-    def test_upload_contract(self):
+    async def test_upload_contract(self):
         """Test uploading a contract document"""
         print("\n🔍 Testing Contract Upload...")
         try:
@@ -84,10 +126,10 @@ class DocumentIngestionTester:
             
             with open(test_file, 'rb') as f:
                 files = {'file': (os.path.basename(test_file), f, 'application/pdf' if test_file.endswith('.pdf') else 'application/vnd.openxmlformats-officedocument.wordprocessingml.document')}
-                response = requests.post(
+                response = await self.client.post(
                     f"{self.base_url}/api/upload?document_type=contract",
                     files=files,
-                    timeout=30
+                    timeout=TIMEOUT_LONG
                 )
             
             if response.status_code == 200:
@@ -116,7 +158,7 @@ class DocumentIngestionTester:
         except Exception as e:
             return self.log_result("Contract Upload", False, str(e))
 
-    def test_upload_proposal(self):
+    async def test_upload_proposal(self):
         """Test uploading a proposal document"""
         print("\n🔍 Testing Proposal Upload...")
         try:
@@ -130,10 +172,10 @@ class DocumentIngestionTester:
             
             with open(test_file, 'rb') as f:
                 files = {'file': (f"proposal_{os.path.basename(test_file)}", f, 'application/pdf' if test_file.endswith('.pdf') else 'application/vnd.openxmlformats-officedocument.wordprocessingml.document')}
-                response = requests.post(
+                response = await self.client.post(
                     f"{self.base_url}/api/upload?document_type=proposal",
                     files=files,
-                    timeout=30
+                    timeout=TIMEOUT_LONG
                 )
             
             if response.status_code == 200:
@@ -162,11 +204,11 @@ class DocumentIngestionTester:
         except Exception as e:
             return self.log_result("Proposal Upload", False, str(e))
 
-    def test_list_documents_after_upload(self):
+    async def test_list_documents_after_upload(self):
         """Test listing documents after uploads"""
         print("\n🔍 Testing List Documents (After Upload)...")
         try:
-            response = requests.get(f"{self.base_url}/api/documents", timeout=10)
+            response = await self.client.get(f"{self.base_url}/api/documents", timeout=TIMEOUT_SHORT)
             if response.status_code == 200:
                 data = response.json()
                 
@@ -196,11 +238,11 @@ class DocumentIngestionTester:
         except Exception as e:
             return self.log_result("List Documents (After Upload)", False, str(e))
 
-    def test_get_active_documents(self):
+    async def test_get_active_documents(self):
         """Test getting active documents"""
         print("\n🔍 Testing Get Active Documents...")
         try:
-            response = requests.get(f"{self.base_url}/api/documents/active", timeout=10)
+            response = await self.client.get(f"{self.base_url}/api/documents/active", timeout=TIMEOUT_SHORT)
             if response.status_code == 200:
                 data = response.json()
                 
@@ -226,7 +268,7 @@ class DocumentIngestionTester:
         except Exception as e:
             return self.log_result("Get Active Documents", False, str(e))
 
-    def test_set_active_document(self):
+    async def test_set_active_document(self):
         """Test setting a document as active"""
         print("\n🔍 Testing Set Active Document...")
         if not self.contract_file_ids:
@@ -237,11 +279,11 @@ class DocumentIngestionTester:
                 "file_id": self.contract_file_ids[0],
                 "document_type": "contract"
             }
-            response = requests.post(
+            response = await self.client.post(
                 f"{self.base_url}/api/documents/set-active",
                 json=payload,
                 headers={'Content-Type': 'application/json'},
-                timeout=10
+                timeout=TIMEOUT_SHORT
             )
             
             if response.status_code == 200:
@@ -266,7 +308,7 @@ class DocumentIngestionTester:
         except Exception as e:
             return self.log_result("Set Active Document", False, str(e))
 
-    def test_additive_uploads(self):
+    async def test_additive_uploads(self):
         """Test additive upload behavior - upload second contract"""
         print("\n🔍 Testing Additive Uploads (Second Contract)...")
         try:
@@ -279,10 +321,10 @@ class DocumentIngestionTester:
             
             with open(test_file, 'rb') as f:
                 files = {'file': (f"contract_b_{os.path.basename(test_file)}", f, 'application/pdf' if test_file.endswith('.pdf') else 'application/vnd.openxmlformats-officedocument.wordprocessingml.document')}
-                response = requests.post(
+                response = await self.client.post(
                     f"{self.base_url}/api/upload?document_type=contract",
                     files=files,
-                    timeout=30
+                    timeout=TIMEOUT_LONG
                 )
             
             if response.status_code == 200:
@@ -294,7 +336,7 @@ class DocumentIngestionTester:
                 is_new_active = data.get('is_active') == True
                 
                 # Check that both contracts exist in list
-                list_response = requests.get(f"{self.base_url}/api/documents", timeout=10)
+                list_response = await self.client.get(f"{self.base_url}/api/documents", timeout=TIMEOUT_SHORT)
                 if list_response.status_code == 200:
                     docs = list_response.json()
                     contract_docs = [doc for doc in docs if doc.get('document_type') == 'contract']
@@ -326,12 +368,12 @@ class DocumentIngestionTester:
         except Exception as e:
             return self.log_result("Additive Uploads", False, str(e))
 
-    def test_proposal_independence(self):
+    async def test_proposal_independence(self):
         """Test that proposal uploads don't affect contract active status"""
         print("\n🔍 Testing Proposal Independence...")
         try:
             # Get current active contract
-            active_response = requests.get(f"{self.base_url}/api/documents/active", timeout=10)
+            active_response = await self.client.get(f"{self.base_url}/api/documents/active", timeout=TIMEOUT_SHORT)
             if active_response.status_code != 200:
                 return self.log_result("Proposal Independence", False, "Failed to get active documents")
             
@@ -348,15 +390,15 @@ class DocumentIngestionTester:
             
             with open(test_file, 'rb') as f:
                 files = {'file': (f"proposal_b_{os.path.basename(test_file)}", f, 'application/pdf' if test_file.endswith('.pdf') else 'application/vnd.openxmlformats-officedocument.wordprocessingml.document')}
-                response = requests.post(
+                response = await self.client.post(
                     f"{self.base_url}/api/upload?document_type=proposal",
                     files=files,
-                    timeout=30
+                    timeout=TIMEOUT_LONG
                 )
             
             if response.status_code == 200:
                 # Check active documents again
-                active_after_response = requests.get(f"{self.base_url}/api/documents/active", timeout=10)
+                active_after_response = await self.client.get(f"{self.base_url}/api/documents/active", timeout=TIMEOUT_SHORT)
                 if active_after_response.status_code == 200:
                     active_after = active_after_response.json()
                     contract_after = active_after.get('contract')
@@ -381,7 +423,7 @@ class DocumentIngestionTester:
         except Exception as e:
             return self.log_result("Proposal Independence", False, str(e))
 
-    def test_delete_document(self):
+    async def test_delete_document(self):
         """Test deleting a document"""
         print("\n🔍 Testing Delete Document...")
         if not self.contract_file_ids:
@@ -391,9 +433,9 @@ class DocumentIngestionTester:
             # Use the first contract for deletion
             file_id_to_delete = self.contract_file_ids[0]
             
-            response = requests.delete(
+            response = await self.client.delete(
                 f"{self.base_url}/api/documents/{file_id_to_delete}",
-                timeout=10
+                timeout=TIMEOUT_SHORT
             )
             
             if response.status_code == 200:
@@ -402,7 +444,7 @@ class DocumentIngestionTester:
                 correct_file_id = data.get('file_id') == file_id_to_delete
                 
                 # Verify document is removed from list
-                list_response = requests.get(f"{self.base_url}/api/documents", timeout=10)
+                list_response = await self.client.get(f"{self.base_url}/api/documents", timeout=TIMEOUT_SHORT)
                 if list_response.status_code == 200:
                     docs = list_response.json()
                     file_ids = [doc.get('file_id') for doc in docs]
@@ -444,26 +486,28 @@ class DocumentIngestionTester:
         
         return 0 if self.tests_passed == self.tests_run else 1
 
-def main():
+async def main():
     print("="*60)
     print("🚀 Document Ingestion & Persistent Memory Testing")
     print("="*60)
     
-    tester = DocumentIngestionTester()
-    
-    # Run document ingestion tests in sequence
-    tester.test_health_check()
-    tester.test_list_documents_empty()
-    tester.test_upload_contract()
-    tester.test_upload_proposal()
-    tester.test_list_documents_after_upload()
-    tester.test_get_active_documents()
-    tester.test_set_active_document()
-    tester.test_additive_uploads()
-    tester.test_proposal_independence()
-    tester.test_delete_document()
+    async with DocumentIngestionTester() as tester:
+        # Read-only checks are independent, so overlap their round trips
+        await asyncio.gather(tester.test_health_check(), tester.test_list_documents_empty())
+        
+        # Uploads produce the file IDs the later tests rely on
+        await tester.test_upload_contract()
+        await tester.test_upload_proposal()
+        
+        await asyncio.gather(tester.test_list_documents_after_upload(), tester.test_get_active_documents())
+        
+        # State-changing tests depend on each other's results; keep them in sequence
+        await tester.test_set_active_document()
+        await tester.test_additive_uploads()
+        await tester.test_proposal_independence()
+        await tester.test_delete_document()
     
     return tester.print_summary()
 
 if __name__ == "__main__":
-    sys.exit(main())
+    sys.exit(asyncio.run(main()))